@@ -1,17 +1,35 @@
 import random
 import math
 import json
-from dataclasses import dataclass, asdict
-from typing import List, Tuple, Optional
+from dataclasses import dataclass
+from typing import Dict, List, Tuple, Optional
 from enum import Enum
 import time
 
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # Numba is optional; fall back to the numpy code paths
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+    
+    prange = range
+
 class RobotType(Enum):
     SCOUT = "scout"          # Fast but low water capacity
     STANDARD = "standard"    # Balanced
     HEAVY = "heavy"         # Slow but high water capacity
 
-@dataclass
+# Robot type ids stored in RescueBotsSimulation.rtype index into this tuple
+ROBOT_TYPES = tuple(RobotType)
+
+@dataclass(slots=True)
 class Building:
     id: int
     x: float
@@ -21,7 +39,7 @@ class Building:
     fire_start_time: float = 0.0
     destroyed: bool = False
     
-@dataclass
+@dataclass(slots=True)
 class Robot:
     id: int
     x: float
@@ -37,21 +55,140 @@ class Robot:
     fires_extinguished: int = 0
     distance_traveled: float = 0.0
     
-@dataclass
+@dataclass(slots=True)
 class Fire:
     building_id: int
     intensity: float
     spread_rate: float
     priority: int = 1  # 1-5, higher is more urgent
 
-@dataclass
+@dataclass(slots=True)
 class WaterStation:
     id: int
     x: float
     y: float
     refill_rate: float = 50.0  # water units per second
 
+@njit(cache=True, fastmath=True, parallel=True)
+def _robot_step_kernel(rx, ry, rspeed, rwater, rwater_max, rextinguish,
+                       rtarget_b, rtarget_s, rfires_extinguished, rdistance,
+                       bx, by, b_onfire, b_intensity, b_destroyed,
+                       sx, sy, s_refill, dt):
+    """Move/refill/extinguish every robot for one step.
+    
+    Robots are updated in parallel; each one only writes its own slots. Writes
+    to the shared building arrays are deferred to a serial pass at the end.
+    
+    Returns, per robot, the building it extinguished this step (-1 if none).
+    """
+    num_robots = rx.shape[0]
+    extinguished = np.full(num_robots, -1, dtype=np.int32)
+    at_fire = np.zeros(num_robots, dtype=np.bool_)
+    
+    for i in prange(num_robots):
+        s = rtarget_s[i]
+        b = rtarget_b[i]
+        
+        # Handle water station targeting
+        if s >= 0:
+            dx = sx[s] - rx[i]
+            dy = sy[s] - ry[i]
+            dist = math.hypot(dx, dy)
+            
+            if dist < 2.0:  # At the station
+                # Refill water
+                rwater[i] += min(s_refill[s] * dt, rwater_max[i] - rwater[i])
+                if rwater[i] >= rwater_max[i] * 0.95:
+                    rtarget_s[i] = -1  # Fully refilled
+                continue
+        
+        # Handle fire targeting
+        elif b >= 0:
+            if b_destroyed[b] or not b_onfire[b]:
+                rtarget_b[i] = -1
+                continue
+            
+            dx = bx[b] - rx[i]
+            dy = by[b] - ry[i]
+            dist = math.hypot(dx, dy)
+            
+            if dist < 1.0:  # Robot reached the building
+                if rwater[i] > 0:
+                    at_fire[i] = True  # Extinguish in the serial pass below
+                else:
+                    rtarget_b[i] = -1
+                continue
+        
+        else:
+            continue
+        
+        # Move towards target
+        move_dist = min(rspeed[i] * dt, dist)
+        rx[i] += (dx / dist) * move_dist
+        ry[i] += (dy / dist) * move_dist
+        rdistance[i] += move_dist
+    
+    # Several robots may work the same building, so extinguish serially
+    for i in range(num_robots):
+        if not at_fire[i]:
+            continue
+        b = rtarget_b[i]
+        if not b_onfire[b]:  # Put out by another robot earlier in this pass
+            rtarget_b[i] = -1
+            continue
+        
+        # Extinguish fire
+        amount = min(rextinguish[i] * dt, b_intensity[b], rwater[i])
+        b_intensity[b] -= amount
+        rwater[i] -= amount
+        
+        if b_intensity[b] <= 0:
+            # Fire extinguished!
+            b_onfire[b] = False
+            b_intensity[b] = 0.0
+            rfires_extinguished[i] += 1
+            extinguished[i] = b
+            rtarget_b[i] = -1
+    
+    return extinguished
+
+
+@njit(cache=True, fastmath=True)
+def _fire_step_kernel(b_onfire, b_intensity, b_destroyed, b_start_t,
+                      spread_rate, time, dt):
+    """Grow every burning building's fire and destroy the ones burning too long.
+    
+    Returns the number of buildings destroyed this step.
+    """
+    destroyed = 0
+    for b in range(b_onfire.shape[0]):
+        if not b_onfire[b] or b_destroyed[b]:
+            continue
+        
+        # Fire grows (but slower now)
+        b_intensity[b] = min(b_intensity[b] + spread_rate[b] * dt * 0.7, 200.0)
+        
+        # Building gets destroyed if fire is too intense for too long
+        if b_intensity[b] > 180 and time - b_start_t[b] > 45:
+            b_destroyed[b] = True
+            b_onfire[b] = False
+            destroyed += 1
+    
+    return destroyed
+
+
 class RescueBotsSimulation:
+    SPREAD_RADIUS = 8.0  # meters (reduced from 10)
+    SPREAD_RADIUS_SQ = SPREAD_RADIUS ** 2
+    PRIORITY_RADIUS = 15.0  # meters; neighborhood counted for fire priority
+    PRIORITY_RADIUS_SQ = PRIORITY_RADIUS ** 2
+    GRID_CELL = max(SPREAD_RADIUS, PRIORITY_RADIUS)  # neighbor grid cell size, meters
+    
+    # Per-type robot stats, indexed by type id (scout, standard, heavy)
+    TYPE_SPEED_RANGE = ((14, 18), (8, 12), (5, 8))
+    TYPE_WATER = (50.0, 120.0, 250.0)  # standard/heavy increased from 100/200
+    TYPE_EXTINGUISH = (3.0, 6.0, 10.0)  # standard/heavy increased from 5.0/8.0
+    
     def __init__(self, city_size=200, num_robots=50, num_buildings=1000, 
                  num_fires=100, num_stations=5):
         self.city_size = city_size
@@ -60,11 +197,47 @@ class RescueBotsSimulation:
         self.num_fires = num_fires
         self.num_stations = num_stations
         
-        self.buildings: List[Building] = []
-        self.robots: List[Robot] = []
-        self.fires: List[Fire] = []
+        self._fires_by_bid: Dict[int, Fire] = {}
+        self._fire_bids_cache: Optional[np.ndarray] = None  # rebuilt when fires start/end
         self.water_stations: List[WaterStation] = []
         
+        # Per-tick state is stored as parallel arrays (one slot per entity);
+        # the Building/Robot dataclasses are only built on demand for export.
+        # Positions, water and intensities are float32 (plenty for a 200 m city);
+        # timestamps and accumulated distances stay float64.
+        
+        # Buildings
+        self.bx: np.ndarray = np.zeros(num_buildings, dtype=np.float32)
+        self.by: np.ndarray = np.zeros(num_buildings, dtype=np.float32)
+        self.b_onfire: np.ndarray = np.zeros(num_buildings, dtype=bool)
+        self.b_intensity: np.ndarray = np.zeros(num_buildings, dtype=np.float32)
+        self.b_fire_start: np.ndarray = np.zeros(num_buildings)
+        self.b_destroyed: np.ndarray = np.zeros(num_buildings, dtype=bool)
+        self.b_spread_rate: np.ndarray = np.zeros(num_buildings, dtype=np.float32)
+        self.b_priority: np.ndarray = np.zeros(num_buildings, dtype=np.int8)
+        
+        # Robots (-1 in a target array means "no target")
+        self.rtype: np.ndarray = np.zeros(num_robots, dtype=np.int8)  # index into ROBOT_TYPES
+        self.rx: np.ndarray = np.zeros(num_robots, dtype=np.float32)
+        self.ry: np.ndarray = np.zeros(num_robots, dtype=np.float32)
+        self.rspeed: np.ndarray = np.zeros(num_robots, dtype=np.float32)
+        self.rwater: np.ndarray = np.zeros(num_robots, dtype=np.float32)
+        self.rwater_max: np.ndarray = np.zeros(num_robots, dtype=np.float32)
+        self.rextinguish: np.ndarray = np.zeros(num_robots, dtype=np.float32)
+        self.rtarget_b: np.ndarray = np.full(num_robots, -1, dtype=np.int32)
+        self.rtarget_s: np.ndarray = np.full(num_robots, -1, dtype=np.int32)
+        self.rfires_extinguished: np.ndarray = np.zeros(num_robots, dtype=np.int32)
+        self.rdistance: np.ndarray = np.zeros(num_robots)
+        
+        # Water stations
+        self.sx: np.ndarray = np.zeros(num_stations, dtype=np.float32)
+        self.sy: np.ndarray = np.zeros(num_stations, dtype=np.float32)
+        self.s_refill: np.ndarray = np.zeros(num_stations, dtype=np.float32)
+        
+        # Static spatial index over building positions (built in _initialize_city)
+        self._building_xy: np.ndarray = np.empty((0, 2), dtype=np.float32)
+        self._grid: Dict[Tuple[int, int], np.ndarray] = {}  # cell -> building ids
+        
         self.time = 0.0
         self.dt = 0.1  # time step in seconds
         
@@ -80,11 +253,12 @@ class RescueBotsSimulation:
         """Initialize all city components"""
         # Create buildings with random positions
         for i in range(self.num_buildings):
-            self.buildings.append(Building(
-                id=i,
-                x=random.uniform(0, self.city_size),
-                y=random.uniform(0, self.city_size)
-            ))
+            self.bx[i] = random.uniform(0, self.city_size)
+            self.by[i] = random.uniform(0, self.city_size)
+        
+        # Buildings never move, so index them once for radius queries
+        self._building_xy = np.column_stack((self.bx, self.by))
+        self._build_grid()
         
         # Create water refill stations strategically placed
         grid_size = int(math.sqrt(self.num_stations))
@@ -99,6 +273,10 @@ class RescueBotsSimulation:
                 y=y + random.uniform(-10, 10)
             ))
         
+        self.sx = np.array([s.x for s in self.water_stations], dtype=np.float32)
+        self.sy = np.array([s.y for s in self.water_stations], dtype=np.float32)
+        self.s_refill = np.array([s.refill_rate for s in self.water_stations], dtype=np.float32)
+        
         # Create robots with different types
         robot_types_distribution = {
             RobotType.SCOUT: 0.2,    # 20% scouts
@@ -110,245 +288,398 @@ class RescueBotsSimulation:
             # Determine robot type
             rand = random.random()
             if rand < 0.2:
-                robot_type = RobotType.SCOUT
-                speed = random.uniform(14, 18)
-                water = 50.0
-                extinguish = 3.0
+                type_id = 0  # RobotType.SCOUT
             elif rand < 0.7:
-                robot_type = RobotType.STANDARD
-                speed = random.uniform(8, 12)
-                water = 120.0  # Increased from 100
-                extinguish = 6.0  # Increased from 5.0
+                type_id = 1  # RobotType.STANDARD
             else:
-                robot_type = RobotType.HEAVY
-                speed = random.uniform(5, 8)
-                water = 250.0  # Increased from 200
-                extinguish = 10.0  # Increased from 8.0
+                type_id = 2  # RobotType.HEAVY
             
-            self.robots.append(Robot(
-                id=i,
-                x=random.uniform(0, self.city_size),
-                y=random.uniform(0, self.city_size),
-                robot_type=robot_type,
-                speed=speed,
-                water_capacity=water,
-                max_water_capacity=water,
-                extinguish_rate=extinguish
-            ))
+            self.rtype[i] = type_id
+            self.rspeed[i] = random.uniform(*self.TYPE_SPEED_RANGE[type_id])
+            self.rx[i] = random.uniform(0, self.city_size)
+            self.ry[i] = random.uniform(0, self.city_size)
+        
+        # Type-dependent constants are gathered from the per-type tables
+        self.rwater_max[:] = np.asarray(self.TYPE_WATER, dtype=np.float32)[self.rtype]
+        self.rwater[:] = self.rwater_max
+        self.rextinguish[:] = np.asarray(self.TYPE_EXTINGUISH, dtype=np.float32)[self.rtype]
         
-        # Start fires in random buildings
-        fire_buildings = random.sample(range(self.num_buildings), self.num_fires)
-        for building_id in fire_buildings:
-            self._start_fire(building_id)
+        # Start fires in random buildings, all at once
+        self._start_initial_fires()
         
         self.total_fires_started = self.num_fires
     
+    def _build_grid(self):
+        """Bucket buildings into square cells one GRID_CELL wide"""
+        cells: Dict[Tuple[int, int], List[int]] = {}
+        for i, (x, y) in enumerate(self._building_xy.tolist()):
+            cells.setdefault((int(x // self.GRID_CELL), int(y // self.GRID_CELL)), []).append(i)
+        self._grid = {cell: np.array(ids, dtype=np.intp) for cell, ids in cells.items()}
+    
+    def _grid_neighbors(self, x: float, y: float) -> np.ndarray:
+        """Ids of buildings in the 3x3 block of cells around (x, y)
+        
+        Covers every building within GRID_CELL of the point (plus some farther ones).
+        """
+        cx, cy = int(x // self.GRID_CELL), int(y // self.GRID_CELL)
+        empty = np.empty(0, dtype=np.intp)
+        return np.concatenate([self._grid.get((cx + i, cy + j), empty)
+                               for i in (-1, 0, 1) for j in (-1, 0, 1)])
+    
+    @property
+    def buildings(self) -> List[Building]:
+        """Read-only snapshot of all buildings as dataclasses, for external callers
+        
+        The objects are copies of the state arrays: modifying them does not change
+        the simulation (write to b_onfire, b_intensity, ... instead).
+        """
+        return [Building(id=i,
+                         x=float(self.bx[i]),
+                         y=float(self.by[i]),
+                         on_fire=bool(self.b_onfire[i]),
+                         fire_intensity=float(self.b_intensity[i]),
+                         fire_start_time=float(self.b_fire_start[i]),
+                         destroyed=bool(self.b_destroyed[i]))
+                for i in range(self.num_buildings)]
+    
+    @property
+    def robots(self) -> List[Robot]:
+        """Read-only snapshot of all robots as dataclasses, for external callers
+        
+        The objects are copies of the state arrays: modifying them does not change
+        the simulation (write to rx, ry, rwater, ... instead).
+        """
+        return [Robot(id=i,
+                      x=float(self.rx[i]),
+                      y=float(self.ry[i]),
+                      robot_type=ROBOT_TYPES[self.rtype[i]],
+                      speed=float(self.rspeed[i]),
+                      target_building=int(self.rtarget_b[i]) if self.rtarget_b[i] >= 0 else None,
+                      target_station=int(self.rtarget_s[i]) if self.rtarget_s[i] >= 0 else None,
+                      water_capacity=float(self.rwater[i]),
+                      max_water_capacity=float(self.rwater_max[i]),
+                      extinguish_rate=float(self.rextinguish[i]),
+                      fires_extinguished=int(self.rfires_extinguished[i]),
+                      distance_traveled=float(self.rdistance[i]))
+                for i in range(self.num_robots)]
+    
+    @property
+    def fires(self) -> List[Fire]:
+        """Read-only snapshot of the tracked fires (with current intensity), in start order"""
+        return [Fire(building_id=f.building_id,
+                     intensity=float(self.b_intensity[f.building_id]),
+                     spread_rate=f.spread_rate,
+                     priority=f.priority)
+                for f in self._fires_by_bid.values()]
+    
+    @property
+    def num_fires_tracked(self) -> int:
+        """Number of tracked fires (cheap; use this instead of len(sim.fires))"""
+        return len(self._fires_by_bid)
+    
+    def _fire_bids(self) -> np.ndarray:
+        """Building ids of all tracked fires, in the order they were started
+        
+        The array is cached until a fire starts or is extinguished; do not modify it.
+        """
+        if self._fire_bids_cache is None:
+            self._fire_bids_cache = np.fromiter(self._fires_by_bid, dtype=np.intp,
+                                                count=len(self._fires_by_bid))
+        return self._fire_bids_cache
+    
     def _start_fire(self, building_id: int):
         """Start a fire at a specific building"""
         intensity = random.uniform(50, 100)
         priority = self._calculate_fire_priority(building_id, intensity)
+        spread_rate = random.uniform(0.5, 2.0)
         
-        self.buildings[building_id].on_fire = True
-        self.buildings[building_id].fire_intensity = intensity
-        self.buildings[building_id].fire_start_time = self.time
+        self._set_fire_state(np.array([building_id]), np.array([intensity]),
+                             np.array([spread_rate]), np.array([priority]))
+    
+    def _start_initial_fires(self):
+        """Start num_fires fires in random buildings, computing their state in bulk"""
+        fire_bids = np.random.choice(self.num_buildings, self.num_fires, replace=False)
+        intensity = np.random.uniform(50, 100, self.num_fires)
+        spread_rate = np.random.uniform(0.5, 2.0, self.num_fires)
+        nearby_count = np.array([self._nearby_count(bid) for bid in fire_bids.tolist()])
+        priority = self._fire_priorities(intensity, nearby_count)
         
-        self.fires.append(Fire(
-            building_id=building_id,
-            intensity=intensity,
-            spread_rate=random.uniform(0.5, 2.0),
-            priority=priority
-        ))
+        self._set_fire_state(fire_bids, intensity, spread_rate, priority)
+    
+    def _set_fire_state(self, building_ids: np.ndarray, intensity: np.ndarray,
+                        spread_rate: np.ndarray, priority: np.ndarray):
+        """Record new fires (starting now) in the state arrays and the fire dict"""
+        self.b_onfire[building_ids] = True
+        self.b_intensity[building_ids] = intensity
+        self.b_fire_start[building_ids] = self.time
+        self.b_spread_rate[building_ids] = spread_rate
+        self.b_priority[building_ids] = priority
+        
+        for bid, i, rate, prio in zip(building_ids.tolist(), intensity.tolist(),
+                                      spread_rate.tolist(), priority.tolist()):
+            self._fires_by_bid[bid] = Fire(building_id=bid, intensity=i,
+                                           spread_rate=rate, priority=prio)
+        self._fire_bids_cache = None
     
     def _calculate_fire_priority(self, building_id: int, intensity: float) -> int:
         """Calculate fire priority based on intensity and nearby buildings"""
-        building = self.buildings[building_id]
-        
-        # Count nearby buildings
-        nearby_count = sum(1 for b in self.buildings 
-                          if self.distance(building.x, building.y, b.x, b.y) < 15 
-                          and not b.destroyed)
-        
-        # Priority based on intensity and density
-        if intensity > 80 and nearby_count > 10:
-            return 5  # Critical
-        elif intensity > 60 or nearby_count > 7:
-            return 4  # High
-        elif intensity > 40 or nearby_count > 4:
-            return 3  # Medium
-        elif intensity > 20:
-            return 2  # Low
-        else:
-            return 1  # Very low
+        return int(self._fire_priorities(intensity, self._nearby_count(building_id)))
+    
+    def _nearby_count(self, building_id: int) -> int:
+        """Number of standing buildings within PRIORITY_RADIUS (including itself)"""
+        bx, by = self.bx[building_id], self.by[building_id]
+        nearby = self._grid_neighbors(bx, by)
+        d2 = ((self._building_xy[nearby] - (bx, by)) ** 2).sum(1)
+        return int(np.count_nonzero((d2 < self.PRIORITY_RADIUS_SQ) & ~self.b_destroyed[nearby]))
+    
+    @staticmethod
+    def _fire_priorities(intensity, nearby_count) -> np.ndarray:
+        """Priority (1-5) from intensity and density; works elementwise on arrays"""
+        intensity, nearby_count = np.asarray(intensity), np.asarray(nearby_count)
+        return np.select(
+            [(intensity > 80) & (nearby_count > 10),  # Critical
+             (intensity > 60) | (nearby_count > 7),   # High
+             (intensity > 40) | (nearby_count > 4),   # Medium
+             intensity > 20],                         # Low
+            [5, 4, 3, 2],
+            default=1)                                # Very low
     
     def distance(self, x1: float, y1: float, x2: float, y2: float) -> float:
         """Calculate Euclidean distance between two points"""
-        return math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+        return math.hypot(x2 - x1, y2 - y1)
     
     def assign_targets(self):
         """Assign robots to fires or water stations using priority-based greedy algorithm"""
         # Get available robots (not currently assigned)
-        available_robots = [r for r in self.robots 
-                           if r.target_building is None and r.target_station is None]
-        
-        for robot in available_robots:
-            # If low on water, go to nearest water station
-            if robot.water_capacity < robot.max_water_capacity * 0.2:
-                nearest_station = min(self.water_stations,
-                                    key=lambda s: self.distance(robot.x, robot.y, s.x, s.y))
-                robot.target_station = nearest_station.id
-                continue
-            
-            # Otherwise, find highest priority fire that needs help
-            if robot.water_capacity > 0:
-                # FIXED: Only consider fires in buildings that are NOT destroyed
-                fires_needing_help = [f for f in self.fires 
-                                     if f.intensity > 0 
-                                     and not self.buildings[f.building_id].destroyed
-                                     and self.buildings[f.building_id].on_fire]
-                
-                if not fires_needing_help:
-                    continue
-                
-                # Find best fire to target
-                best_fire = min(fires_needing_help,
-                              key=lambda f: (
-                                  -f.priority * 100,  # Negative for descending priority
-                                  self.distance(robot.x, robot.y,
-                                              self.buildings[f.building_id].x,
-                                              self.buildings[f.building_id].y)
-                              ))
-                
-                robot.target_building = best_fire.building_id
+        available = (self.rtarget_b < 0) & (self.rtarget_s < 0)
+        if not available.any():
+            return
+        
+        # If low on water, go to nearest water station
+        low_water = self.rwater < self.rwater_max * 0.2
+        refill_idx = np.flatnonzero(available & low_water)
+        if refill_idx.size:
+            dx = self.rx[refill_idx, None] - self.sx[None, :]
+            dy = self.ry[refill_idx, None] - self.sy[None, :]
+            self.rtarget_s[refill_idx] = (dx * dx + dy * dy).argmin(axis=1)
+        
+        # Otherwise, find highest priority fire that needs help
+        if not self._fires_by_bid:
+            return
+        fire_robot_idx = np.flatnonzero(available & ~low_water & (self.rwater > 0))
+        if not fire_robot_idx.size:
+            return
+        
+        # FIXED: Only consider fires in buildings that are NOT destroyed
+        fire_bids = self._fire_bids()
+        needs_help = (self.b_onfire[fire_bids] & ~self.b_destroyed[fire_bids]
+                      & (self.b_intensity[fire_bids] > 0))
+        fire_bid = fire_bids[needs_help]
+        
+        if not fire_bid.size:
+            return
+        
+        # Find best fire to target: priority first, distance as tie-breaker.
+        # Priority always wins, so only the top priority class can be chosen;
+        # each robot then just needs the nearest fire within that class.
+        fire_prio = self.b_priority[fire_bid]
+        top_bid = fire_bid[fire_prio == fire_prio.max()]
+        dx = self.rx[fire_robot_idx, None] - self.bx[None, top_bid]
+        dy = self.ry[fire_robot_idx, None] - self.by[None, top_bid]
+        
+        self.rtarget_b[fire_robot_idx] = top_bid[(dx * dx + dy * dy).argmin(axis=1)]
     
     def update_robots(self):
         """Move robots towards their targets and perform actions"""
-        for robot in self.robots:
-            last_x, last_y = robot.x, robot.y
-            
-            # Handle water station targeting
-            if robot.target_station is not None:
-                station = self.water_stations[robot.target_station]
-                dist = self.distance(robot.x, robot.y, station.x, station.y)
-                
-                if dist < 2.0:  # At the station
-                    # Refill water
-                    refill_amount = min(station.refill_rate * self.dt,
-                                      robot.max_water_capacity - robot.water_capacity)
-                    robot.water_capacity += refill_amount
-                    
-                    if robot.water_capacity >= robot.max_water_capacity * 0.95:
-                        robot.target_station = None  # Fully refilled
-                else:
-                    # Move towards station
-                    dx = station.x - robot.x
-                    dy = station.y - robot.y
-                    move_dist = min(robot.speed * self.dt, dist)
-                    robot.x += (dx / dist) * move_dist
-                    robot.y += (dy / dist) * move_dist
-            
-            # Handle fire targeting
-            elif robot.target_building is not None:
-                building = self.buildings[robot.target_building]
-                
-                if building.destroyed or not building.on_fire:
-                    robot.target_building = None
-                    continue
-                
-                dist = self.distance(robot.x, robot.y, building.x, building.y)
-                
-                if dist < 1.0:  # Robot reached the building
-                    if building.on_fire and robot.water_capacity > 0:
-                        # Extinguish fire
-                        extinguish_amount = min(robot.extinguish_rate * self.dt,
-                                              building.fire_intensity,
-                                              robot.water_capacity)
-                        building.fire_intensity -= extinguish_amount
-                        robot.water_capacity -= extinguish_amount
-                        
-                        if building.fire_intensity <= 0:
-                            # Fire extinguished!
-                            building.on_fire = False
-                            building.fire_intensity = 0
-                            robot.fires_extinguished += 1
-                            self.total_fires_extinguished += 1
-                            
-                            # Record response time
-                            response_time = self.time - building.fire_start_time
-                            self.response_times.append(response_time)
-                            
-                            # Remove fire from list
-                            self.fires = [f for f in self.fires 
-                                        if f.building_id != robot.target_building]
-                            robot.target_building = None
-                    else:
-                        robot.target_building = None
-                else:
-                    # Move towards target
-                    dx = building.x - robot.x
-                    dy = building.y - robot.y
-                    move_dist = min(robot.speed * self.dt, dist)
-                    robot.x += (dx / dist) * move_dist
-                    robot.y += (dy / dist) * move_dist
+        if NUMBA_AVAILABLE:
+            extinguished = _robot_step_kernel(
+                self.rx, self.ry, self.rspeed, self.rwater, self.rwater_max,
+                self.rextinguish, self.rtarget_b, self.rtarget_s,
+                self.rfires_extinguished, self.rdistance,
+                self.bx, self.by, self.b_onfire, self.b_intensity, self.b_destroyed,
+                self.sx, self.sy, self.s_refill, self.dt)
+            done_buildings = extinguished[extinguished >= 0]
+            if done_buildings.size:
+                self._record_extinguished(done_buildings)
+            return
+        
+        # Bind the state arrays locally; the numpy path references them many times
+        dt = self.dt
+        rx, ry, rwater, rwater_max = self.rx, self.ry, self.rwater, self.rwater_max
+        rtarget_b, rtarget_s = self.rtarget_b, self.rtarget_s
+        
+        # Split robots into disjoint groups; idle robots are never touched
+        to_station = rtarget_s >= 0
+        to_fire = ~to_station & (rtarget_b >= 0)
+        
+        # Drop fire targets that burned down or were put out meanwhile
+        fire_idx = np.flatnonzero(to_fire)
+        target = rtarget_b[fire_idx]
+        lost = fire_idx[self.b_destroyed[target] | ~self.b_onfire[target]]
+        rtarget_b[lost] = -1
+        to_fire[lost] = False
+        
+        active = np.flatnonzero(to_station | to_fire)
+        if not active.size:
+            return
+        
+        # Distance from every active robot to its station or building
+        # (the unused side of each gather may read index -1; np.where discards it)
+        station = to_station[active]
+        station_id, building_id = rtarget_s[active], rtarget_b[active]
+        tx = np.where(station, self.sx[station_id], self.bx[building_id])
+        ty = np.where(station, self.sy[station_id], self.by[building_id])
+        dist = np.hypot(tx - rx[active], ty - ry[active])
+        arrived = dist < np.where(station, 2.0, 1.0)  # At the station / reached the building
+        
+        # Refill water
+        at_station = station & arrived
+        refill_idx = active[at_station]
+        if refill_idx.size:
+            refill_amount = np.minimum(self.s_refill[station_id[at_station]] * dt,
+                                       rwater_max[refill_idx] - rwater[refill_idx])
+            rwater[refill_idx] += refill_amount
+            full = rwater[refill_idx] >= rwater_max[refill_idx] * 0.95
+            rtarget_s[refill_idx[full]] = -1  # Fully refilled
+        
+        at_fire = ~station & arrived
+        fire_idx, target = active[at_fire], building_id[at_fire]
+        if fire_idx.size:
+            # Out of water at the fire: give up the target
+            dry = rwater[fire_idx] <= 0
+            rtarget_b[fire_idx[dry]] = -1
             
-            # Track distance traveled
-            robot.distance_traveled += self.distance(last_x, last_y, robot.x, robot.y)
+            # Extinguish fire (several robots may work the same building)
+            if not dry.all():
+                self._extinguish(fire_idx[~dry], target[~dry])
+        
+        # Move towards station or target
+        moving = ~arrived
+        move_idx, dist = active[moving], dist[moving]
+        move_dist = np.minimum(self.rspeed[move_idx] * dt, dist)
+        rx[move_idx] += (tx[moving] - rx[move_idx]) / dist * move_dist
+        ry[move_idx] += (ty[moving] - ry[move_idx]) / dist * move_dist
+        
+        # Track distance traveled
+        self.rdistance[move_idx] += move_dist
+    
+    def _extinguish(self, robot_idx: np.ndarray, building_idx: np.ndarray):
+        """Apply one step of extinguishing by robots standing at burning buildings
+        
+        Robots at the same building act in robot order, as in _robot_step_kernel:
+        each one takes what is left of the fire, the one that brings it to 0 gets
+        the credit, and the ones after it drop the target without spending water.
+        """
+        # Group robots by building, keeping robot order within each group
+        order = np.argsort(building_idx, kind='stable')
+        robot_idx, building_idx = robot_idx[order], building_idx[order]
+        
+        requested = np.minimum(self.rextinguish[robot_idx] * self.dt,
+                               self.rwater[robot_idx]).astype(np.float64)
+        
+        # Amount already applied by earlier robots at the same building
+        applied_after = np.cumsum(requested)
+        group_start = np.flatnonzero(np.r_[True, building_idx[1:] != building_idx[:-1]])
+        group_len = np.diff(np.r_[group_start, building_idx.size])
+        applied_before = applied_after - requested
+        applied_before -= np.repeat(applied_before[group_start], group_len)
+        
+        intensity = self.b_intensity[building_idx].astype(np.float64)
+        extinguish_amount = np.clip(intensity - applied_before, 0.0, requested)
+        late = applied_before >= intensity  # Fire already out when this robot acts
+        finisher = ~late & (applied_before + requested >= intensity)
+        
+        np.subtract.at(self.b_intensity, building_idx, extinguish_amount.astype(np.float32))
+        self.rwater[robot_idx] -= extinguish_amount.astype(np.float32)
+        self.rtarget_b[robot_idx[late]] = -1
+        
+        if not finisher.any():
+            return
+        
+        # Fire extinguished! Credit the robot that put it out.
+        finisher_idx = robot_idx[finisher]
+        by_robot = np.argsort(finisher_idx, kind='stable')
+        finisher_idx, done_buildings = finisher_idx[by_robot], building_idx[finisher][by_robot]
+        self.rfires_extinguished[finisher_idx] += 1
+        self.rtarget_b[finisher_idx] = -1
+        
+        self.b_onfire[done_buildings] = False
+        self.b_intensity[done_buildings] = 0
+        self._record_extinguished(done_buildings)
+    
+    def _record_extinguished(self, done_buildings: np.ndarray):
+        """Update statistics and the fire list for buildings just extinguished"""
+        self.total_fires_extinguished += len(done_buildings)
+        
+        # Record response time
+        self.response_times.extend((self.time - self.b_fire_start[done_buildings]).tolist())
+        
+        # Drop the extinguished fires (O(1) each)
+        for building_id in done_buildings.tolist():
+            self._fires_by_bid.pop(building_id, None)
+        self._fire_bids_cache = None
     
     def update_fires(self):
         """Update fire intensity and handle fire spread"""
         new_fires = []
         
-        for fire in self.fires:
-            building = self.buildings[fire.building_id]
+        if NUMBA_AVAILABLE:
+            self.total_buildings_destroyed += _fire_step_kernel(
+                self.b_onfire, self.b_intensity, self.b_destroyed, self.b_fire_start,
+                self.b_spread_rate, self.time, self.dt)
+        else:
+            burning = self.b_onfire & ~self.b_destroyed
+            
+            # Fire grows (but slower now)
+            self.b_intensity[burning] = np.minimum(
+                self.b_intensity[burning] + self.b_spread_rate[burning] * self.dt * 0.7,  # 30% slower growth
+                200.0)
             
-            if building.on_fire and not building.destroyed:
-                # Fire grows (but slower now)
-                building.fire_intensity += fire.spread_rate * self.dt * 0.7  # 30% slower growth
-                building.fire_intensity = min(building.fire_intensity, 200)
-                fire.intensity = building.fire_intensity
-                
-                # Building gets destroyed if fire is too intense for too long
-                if building.fire_intensity > 180:  # Increased from 150
-                    time_on_fire = self.time - building.fire_start_time
-                    if time_on_fire > 45:  # Increased from 30 seconds
-                        building.destroyed = True
-                        building.on_fire = False
-                        self.total_buildings_destroyed += 1
-                        # Remove this fire
-                        continue
-                
-                # Fire spread mechanics (very small chance each step)
-                # Only spread if fire is very intense and not being fought
-                robots_nearby = sum(1 for r in self.robots 
-                                  if r.target_building == building.id)
-                if robots_nearby == 0 and random.random() < 0.0001 * self.dt * building.fire_intensity:
-                    self._try_spread_fire(building, new_fires)
+            # Building gets destroyed if fire is too intense for too long
+            too_hot = self.b_intensity > 180  # Increased from 150
+            expired = (self.time - self.b_fire_start) > 45  # Increased from 30 seconds
+            killed = too_hot & expired & burning
+            self.b_destroyed |= killed
+            self.b_onfire &= ~killed
+            self.total_buildings_destroyed += int(np.count_nonzero(killed))
+        
+        # Fire spread mechanics (very small chance each step)
+        # Only spread if fire is very intense and not being fought
+        fire_bids = self._fire_bids()
+        burning_bids = fire_bids[self.b_onfire[fire_bids]]
+        
+        # How many robots are currently targeting each building
+        targeting = np.bincount(self.rtarget_b[self.rtarget_b >= 0], minlength=self.num_buildings)
+        
+        # Draw every fire's spread trial at once; only the winners do the neighbor search
+        trials = np.random.random(burning_bids.size) < 0.0001 * self.dt * self.b_intensity[burning_bids]
+        for bid in burning_bids[trials & (targeting[burning_bids] == 0)].tolist():
+            self._try_spread_fire(bid, new_fires)
         
         # Add new fires from spreading
         for building_id in new_fires:
-            if not self.buildings[building_id].on_fire:
+            if not self.b_onfire[building_id]:
                 self._start_fire(building_id)
                 self.total_fires_started += 1
     
-    def _try_spread_fire(self, source_building: Building, new_fires: List[int]):
+    def _try_spread_fire(self, source_id: int, new_fires: List[int]):
         """Attempt to spread fire to nearby buildings"""
-        spread_radius = 8.0  # meters (reduced from 10)
+        sx, sy = self.bx[source_id], self.by[source_id]
         
         # Only spread to max 1 building per fire
-        potential_targets = []
-        for building in self.buildings:
-            if building.id != source_building.id and not building.on_fire and not building.destroyed:
-                dist = self.distance(source_building.x, source_building.y,
-                                   building.x, building.y)
-                
-                if dist < spread_radius:
-                    potential_targets.append((building, dist))
-        
-        if potential_targets:
+        nearby = self._grid_neighbors(sx, sy)
+        d2 = ((self._building_xy[nearby] - (sx, sy)) ** 2).sum(1)
+        mask = ((d2 < self.SPREAD_RADIUS_SQ) & (nearby != source_id)
+                & ~self.b_destroyed[nearby] & ~self.b_onfire[nearby])
+        
+        if mask.any():
             # Pick closest building with low probability
-            building, dist = min(potential_targets, key=lambda x: x[1])
-            spread_prob = 0.15 * (1 - dist / spread_radius)  # Reduced from 0.3
+            candidates = np.flatnonzero(mask)
+            closest = candidates[d2[candidates].argmin()]
+            dist = math.sqrt(d2[closest])
+            spread_prob = 0.15 * (1 - dist / self.SPREAD_RADIUS)  # Reduced from 0.3
             if random.random() < spread_prob:
-                new_fires.append(building.id)
+                new_fires.append(int(nearby[closest]))
     
     def step(self):
         """Run one simulation step"""
@@ -359,14 +690,16 @@ class RescueBotsSimulation:
     
     def get_stats(self):
         """Get current simulation statistics"""
-        active_fires = len([f for f in self.fires if f.intensity > 0])
-        robots_fighting = len([r for r in self.robots if r.target_building is not None])
-        robots_refilling = len([r for r in self.robots if r.target_station is not None])
-        robots_idle = len([r for r in self.robots 
-                          if r.target_building is None and r.target_station is None])
+        fire_bids = self._fire_bids()
+        fire_intensity = self.b_intensity[fire_bids]
+        
+        active_fires = int(np.count_nonzero(fire_intensity > 0))
+        robots_fighting = int(np.count_nonzero(self.rtarget_b >= 0))
+        robots_refilling = int(np.count_nonzero(self.rtarget_s >= 0))
+        robots_idle = int(np.count_nonzero((self.rtarget_b < 0) & (self.rtarget_s < 0)))
         
-        avg_water = sum(r.water_capacity for r in self.robots) / len(self.robots)
-        total_fire_intensity = sum(f.intensity for f in self.fires)
+        avg_water = float(self.rwater.mean())
+        total_fire_intensity = float(fire_intensity.sum())
         
         avg_response_time = (sum(self.response_times) / len(self.response_times) 
                            if self.response_times else 0)
@@ -385,14 +718,65 @@ class RescueBotsSimulation:
             'avg_response_time': round(avg_response_time, 1)
         }
     
+    @staticmethod
+    def _f32_list(values: np.ndarray) -> List[float]:
+        """float32 array as Python floats, each the shortest decimal that round-trips
+        
+        Keeps float32 noise (e.g. 37.18230056762695 for 37.1823) out of the export.
+        """
+        return values.astype(str).astype(np.float64).tolist()
+    
+    def _check_state(self):
+        """Assert that float32 refill/extinguish updates have not drifted out of range"""
+        eps = 1e-4
+        assert (self.rwater >= -eps).all(), "robot water went negative"
+        assert (self.rwater <= self.rwater_max * (1 + eps)).all(), "robot water above capacity"
+        assert ((self.b_intensity >= -eps) & (self.b_intensity <= 200 + eps)).all(), \
+            "fire intensity out of [0, 200]"
+        assert not (self.b_onfire & (self.b_intensity <= 0)).any(), \
+            "building on fire with no intensity"
+    
     def export_state(self):
         """Export current state for visualization"""
+        # Convert each state array to a Python list once, then zip the columns
+        f32 = self._f32_list
+        bx, by = f32(self.bx), f32(self.by)
+        b_onfire, b_destroyed = self.b_onfire.tolist(), self.b_destroyed.tolist()
+        b_intensity, b_fire_start = f32(self.b_intensity), self.b_fire_start.tolist()
+        b_spread_rate = f32(self.b_spread_rate)
+        buildings = [{'id': i, 'x': x, 'y': y, 'on_fire': on_fire,
+                      'fire_intensity': intensity, 'fire_start_time': start,
+                      'destroyed': destroyed}
+                     for i, (x, y, on_fire, intensity, start, destroyed)
+                     in enumerate(zip(bx, by, b_onfire, b_intensity, b_fire_start, b_destroyed))]
+        
+        robots = [{'id': i, 'x': x, 'y': y, 'robot_type': ROBOT_TYPES[type_id].value, 'speed': speed,
+                   'target_building': target_b if target_b >= 0 else None,
+                   'target_station': target_s if target_s >= 0 else None,
+                   'extinguishing': False,
+                   'water_capacity': water, 'max_water_capacity': water_max,
+                   'extinguish_rate': rate, 'fires_extinguished': extinguished,
+                   'distance_traveled': traveled}
+                  for i, (x, y, type_id, speed, target_b, target_s, water, water_max,
+                          rate, extinguished, traveled)
+                  in enumerate(zip(f32(self.rx), f32(self.ry), self.rtype.tolist(),
+                                   f32(self.rspeed), self.rtarget_b.tolist(),
+                                   self.rtarget_s.tolist(), f32(self.rwater),
+                                   f32(self.rwater_max), f32(self.rextinguish),
+                                   self.rfires_extinguished.tolist(), self.rdistance.tolist()))]
+        
+        fires = [{'building_id': f.building_id, 'intensity': b_intensity[f.building_id],
+                  'spread_rate': b_spread_rate[f.building_id], 'priority': f.priority}
+                 for f in self._fires_by_bid.values()]
+        
         return {
             'time': self.time,
-            'buildings': [asdict(b) for b in self.buildings],
-            'robots': [{**asdict(r), 'robot_type': r.robot_type.value} for r in self.robots],
-            'fires': [asdict(f) for f in self.fires],
-            'water_stations': [asdict(s) for s in self.water_stations],
+            'buildings': buildings,
+            'robots': robots,
+            'fires': fires,
+            'water_stations': [{'id': s.id, 'x': x, 'y': y, 'refill_rate': rate}
+                               for s, x, y, rate in zip(self.water_stations, f32(self.sx),
+                                                        f32(self.sy), f32(self.s_refill))],
             'stats': self.get_stats()
         }
     
@@ -418,9 +802,7 @@ class RescueBotsSimulation:
         print(f"  Avg Response Time: {stats['avg_response_time']}s")
         
         # Robot type breakdown
-        scouts = sum(1 for r in self.robots if r.robot_type == RobotType.SCOUT)
-        standard = sum(1 for r in self.robots if r.robot_type == RobotType.STANDARD)
-        heavy = sum(1 for r in self.robots if r.robot_type == RobotType.HEAVY)
+        scouts, standard, heavy = np.bincount(self.rtype, minlength=len(ROBOT_TYPES)).tolist()
         print(f"\nRobot Fleet Composition:")
         print(f"  Scouts: {scouts} | Standard: {standard} | Heavy: {heavy}")
         print("="*70)
@@ -451,6 +833,7 @@ if __name__ == "__main__":
         
         # Print stats every 10 seconds of simulation time
         if i % 100 == 0:
+            sim._check_state()
             stats = sim.get_stats()
             print(f"[{stats['time']:6.1f}s] Fires: {stats['active_fires']:3d} | "
                   f"Fighting: {stats['robots_fighting']:2d} | "
@@ -458,7 +841,7 @@ if __name__ == "__main__":
                   f"Destroyed: {stats['buildings_destroyed']:2d}")
         
         # Stop if all fires are out
-        if len(sim.fires) == 0:
+        if sim.num_fires_tracked == 0:
             print("\n✅ SUCCESS! All fires extinguished!")
             break
         